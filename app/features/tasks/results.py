@@ -0,0 +1,47 @@
+"""Helpers for storing and looking up task processing results."""
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.models import TaskResult
+
+
+def params_hash(params: dict) -> str:
+    """Return a stable hash of processing params (key order doesn't matter)."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def save_result(db: Session, task_id: int, kind: str, params: dict, path: str | None, error: str | None = None) -> TaskResult:
+    """Create or overwrite the result of `kind` for `task_id` with these params. Caller commits."""
+    digest = params_hash(params)
+    result = (
+        db.query(TaskResult)
+        .filter(TaskResult.task_id == task_id, TaskResult.kind == kind, TaskResult.params_hash == digest)
+        .first()
+    )
+    if result is None:
+        result = TaskResult(task_id=task_id, kind=kind, params_hash=digest)
+    result.params = json.dumps(params)
+    result.path = path
+    result.error = error
+    # set explicitly: a re-run with identical output must still become the latest result
+    result.updated_at = datetime.now(timezone.utc)
+    db.add(result)
+    return result
+
+
+def latest_results(db: Session, task_id: int) -> dict[str, TaskResult]:
+    """Return the most recently updated result of each kind for a task."""
+    rows = (
+        db.query(TaskResult)
+        .filter(TaskResult.task_id == task_id)
+        .order_by(TaskResult.kind, TaskResult.updated_at.desc(), TaskResult.id.desc())
+        .all()
+    )
+    latest: dict[str, TaskResult] = {}
+    for row in rows:
+        latest.setdefault(row.kind, row)
+    return latest
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Request, UploadFile, File, Form, Depends
 from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 import os
 import uuid
 
 from app.dependencies import get_db
 from app.models import Task, User
 from app.image.ndvi import compute_ndvi
-import json
+from app.image.bands import band_file_name, resolve_band_files
+from app.features.tasks.results import latest_results, params_hash, save_result
 
 templates = Jinja2Templates(directory="app/templates")
 router = APIRouter()
@@ -17,7 +18,12 @@ router = APIRouter()
 @router.get("/tasks", response_class=HTMLResponse)
 def list_tasks(request: Request, db: Session = Depends(get_db)):
     # show tasks list and simple create form
-    tasks = db.query(Task).order_by(Task.created_at.desc()).all()
+    tasks = (
+        db.query(Task)
+        .options(load_only(Task.id, Task.title, Task.description, Task.created_at))
+        .order_by(Task.created_at.desc())
+        .all()
+    )
     return templates.TemplateResponse("tasks.html", {"request": request, "tasks": tasks, "user": request.state.user})
 
 
@@ -37,11 +43,19 @@ def task_detail(request: Request, task_id: int, db: Session = Depends(get_db)):
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         return RedirectResponse(url="/tasks", status_code=303)
-    return templates.TemplateResponse("task_detail.html", {"request": request, "task": task, "user": request.state.user})
+    results = latest_results(db, task.id)
+    return templates.TemplateResponse("task_detail.html", {
+        "request": request,
+        "task": task,
+        "user": request.state.user,
+        "ndvi": results.get("ndvi"),
+        "segmentation": results.get("segmentation"),
+    })
 
 
 @router.post("/tasks/{task_id}/upload")
-def upload_photo(request: Request, task_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+def upload_photo(request: Request, task_id: int, file: list[UploadFile] = File(...), db: Session = Depends(get_db)):
+    """Upload a task photo. Several files are stored as separate bands of one photo, in upload order."""
     user = request.state.user
     if not user:
         return RedirectResponse(url="/login", status_code=303)
@@ -50,21 +64,27 @@ def upload_photo(request: Request, task_id: int, file: UploadFile = File(...), d
         return RedirectResponse(url="/", status_code=303)
 
     # validate image
-    content_type = file.content_type or ""
-    if not content_type.startswith("image/"):
-        return RedirectResponse(url=f"/tasks/{task_id}", status_code=303)
+    for upload in file:
+        content_type = upload.content_type or ""
+        if not content_type.startswith("image/"):
+            return RedirectResponse(url=f"/tasks/{task_id}", status_code=303)
 
     uploads_dir = os.path.join("app", "static", "uploads")
     os.makedirs(uploads_dir, exist_ok=True)
-    filename_raw = file.filename or f"{uuid.uuid4().hex}.jpg"
-    ext = os.path.splitext(filename_raw)[1]
-    filename = f"{uuid.uuid4().hex}{ext}"
-    path = os.path.join(uploads_dir, filename)
-
-    with open(path, "wb") as f:
-        f.write(file.file.read())
-
-    task.photo_path = f"/static/uploads/{filename}"
+    stem = uuid.uuid4().hex
+    filenames = []
+    for i, upload in enumerate(file):
+        filename_raw = upload.filename or f"{uuid.uuid4().hex}.jpg"
+        ext = os.path.splitext(filename_raw)[1]
+        # band files share one stem so NDVI can find the whole photo from photo_path
+        filename = band_file_name(stem, i, ext) if len(file) > 1 else f"{stem}{ext}"
+        path = os.path.join(uploads_dir, filename)
+
+        with open(path, "wb") as f:
+            f.write(upload.file.read())
+        filenames.append(filename)
+
+    task.photo_path = f"/static/uploads/{filenames[0]}"
     db.add(task)
     db.commit()
     return RedirectResponse(url=f"/tasks/{task_id}", status_code=303)
@@ -96,25 +116,18 @@ def make_ndvi(request: Request, task_id: int, red_index: int = Form(0), nir_inde
 
     uploads_dir = os.path.join("app", "static", "uploads")
     os.makedirs(uploads_dir, exist_ok=True)
-    # Use a stable filename per task so NDVI results are overwritten rather than creating many files
-    ndvi_filename = f"ndvi_task_{task.id}.png"
+    params = {"red_index": red_index, "nir_index": nir_index}
+    # One file per task and params, so re-running with the same params overwrites it
+    ndvi_filename = f"ndvi_task_{task.id}_{params_hash(params)[:12]}.png"
     ndvi_path_fs = os.path.join(uploads_dir, ndvi_filename)
     ndvi_url = f"/static/uploads/{ndvi_filename}"
 
-    ok = compute_ndvi(file_path, ndvi_path_fs, red_index=red_index, nir_index=nir_index)
+    ok = compute_ndvi(resolve_band_files(file_path), ndvi_path_fs, red_index=red_index, nir_index=nir_index)
     if ok:
-        task.ndvi_path = ndvi_url
-        task.ndvi_params = json.dumps({"red_index": red_index, "nir_index": nir_index})
-        task.ndvi_error = None
-        db.add(task)
-        db.commit()
+        save_result(db, task.id, "ndvi", params, ndvi_url)
     else:
-        # mark error and clear ndvi_path
-        task.ndvi_error = f"NDVI не получилось для red={red_index}, nir={nir_index}"
-        task.ndvi_path = None
-        task.ndvi_params = json.dumps({"red_index": red_index, "nir_index": nir_index})
-        db.add(task)
-        db.commit()
+        save_result(db, task.id, "ndvi", params, None, f"NDVI не получилось для red={red_index}, nir={nir_index}")
+    db.commit()
     return RedirectResponse(url=f"/tasks/{task_id}", status_code=303)
 
 
@@ -148,7 +161,8 @@ def make_segmentation(request: Request, task_id: int, method: str = Form("yolo")
 
     uploads_dir = os.path.join("app", "static", "uploads")
     os.makedirs(uploads_dir, exist_ok=True)
-    seg_filename = f"segm_task_{task.id}.png"
+    params = {"method": method, "conf": float(conf)}
+    seg_filename = f"segm_task_{task.id}_{params_hash(params)[:12]}.png"
     seg_path_fs = os.path.join(uploads_dir, seg_filename)
     seg_url = f"/static/uploads/{seg_filename}"
 
@@ -157,15 +171,9 @@ def make_segmentation(request: Request, task_id: int, method: str = Form("yolo")
 
     ok, msg = run_segmentation(file_path, seg_path_fs, method=method, conf=float(conf))
     if ok:
-        task.segmentation_path = seg_url
-        task.segmentation_params = json.dumps({"method": method, "conf": float(conf)})
-        task.segmentation_error = None
+        save_result(db, task.id, "segmentation", params, seg_url)
     else:
-        task.segmentation_error = msg
-        task.segmentation_path = None
-        task.segmentation_params = json.dumps({"method": method, "conf": float(conf)})
-
-    db.add(task)
+        save_result(db, task.id, "segmentation", params, None, msg)
     db.commit()
     return RedirectResponse(url=f"/tasks/{task_id}", status_code=303)
 
@@ -187,13 +195,17 @@ def delete_task(request: Request, task_id: int, db: Session = Depends(get_db)):
         # not allowed to delete others' tasks
         return RedirectResponse(url="/", status_code=303)
 
-    # remove photo file if present and inside uploads
+    # remove photo and result files if present and inside uploads
+    paths = [r.path for r in task.results if r.path]
     if task.photo_path:
+        paths.append(task.photo_path)
+    for path in paths:
         try:
-            if task.photo_path.startswith("/static/uploads/"):
-                file_path = task.photo_path.replace("/static/", "app/static/")
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+            if path.startswith("/static/uploads/"):
+                file_path = path.replace("/static/", "app/static/")
+                for band_path in resolve_band_files(file_path):
+                    if os.path.exists(band_path):
+                        os.remove(band_path)
         except Exception:
             # ignore file deletion errors
             pass
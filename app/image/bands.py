@@ -0,0 +1,212 @@
+from PIL import Image
+import numpy as np
+import glob
+import os
+import re
+import struct
+from typing import Sequence
+
+# TIFF tags used to locate uncompressed strip data
+_TAG_WIDTH = 256
+_TAG_LENGTH = 257
+_TAG_BITS = 258
+_TAG_COMPRESSION = 259
+_TAG_STRIP_OFFSETS = 273
+_TAG_SAMPLES = 277
+_TAG_STRIP_BYTES = 279
+_TAG_PLANAR = 284
+_TAG_TILE_WIDTH = 322
+_TAG_SAMPLE_FORMAT = 339
+
+# TIFF field type -> (struct code, size in bytes); only integer types are needed here
+_TIFF_TYPES = {1: ("B", 1), 3: ("H", 2), 4: ("I", 4), 16: ("Q", 8)}
+
+# raw band files carry no header, so their shape/dtype must be passed in explicitly
+RAW_EXTENSIONS = (".raw", ".bin")
+
+# band files of one photo are saved as <stem>_b<N><ext>; each band keeps its own (possibly empty) extension
+_BAND_FILE_RE = re.compile(r"^(?P<stem>.+)_b(?P<index>\d+)(?P<ext>\.[^.]*)?$")
+
+
+def band_file_name(stem: str, index: int, ext: str) -> str:
+    """Return the file name used for band `index` of a multi-file photo."""
+    return f"{stem}_b{index}{ext}"
+
+
+def resolve_band_files(path: str) -> list[str]:
+    """Return all band files that belong to the same photo as `path`, ordered by band number.
+
+    A plain single-file photo resolves to [path].
+    """
+    directory, name = os.path.split(path)
+    match = _BAND_FILE_RE.match(name)
+    if not match:
+        return [path]
+    pattern = os.path.join(glob.escape(directory), glob.escape(match.group("stem")) + "_b*")
+    files = []
+    for candidate in glob.glob(pattern):
+        m = _BAND_FILE_RE.match(os.path.basename(candidate))
+        if m and m.group("stem") == match.group("stem"):
+            files.append((int(m.group("index")), candidate))
+    if not files:
+        return [path]
+    return [p for _, p in sorted(files)]
+
+
+def _read_tiff_layout(path: str) -> dict | None:
+    """Parse the first IFD of a classic TIFF and describe its uncompressed strip layout.
+
+    Returns None when the file can't be memory-mapped (not a TIFF, BigTIFF, compressed,
+    tiled, non-contiguous strips or an unusual sample size); callers then fall back to PIL.
+    """
+    with open(path, "rb") as f:
+        header = f.read(8)
+        if len(header) < 8 or header[:2] not in (b"II", b"MM"):
+            return None
+        bo = "<" if header[:2] == b"II" else ">"
+        magic, ifd_offset = struct.unpack(bo + "HI", header[2:])
+        if magic != 42:
+            return None
+
+        f.seek(ifd_offset)
+        (count,) = struct.unpack(bo + "H", f.read(2))
+        entries = f.read(12 * count)
+        tags: dict[int, list[int]] = {}
+        for i in range(count):
+            tag, typ, n = struct.unpack(bo + "HHI", entries[i * 12:i * 12 + 8])
+            raw = entries[i * 12 + 8:i * 12 + 12]
+            if typ not in _TIFF_TYPES:
+                continue
+            code, size = _TIFF_TYPES[typ]
+            if n * size <= 4:
+                data = raw[:n * size]
+            else:
+                (offset,) = struct.unpack(bo + "I", raw)
+                pos = f.tell()
+                f.seek(offset)
+                data = f.read(n * size)
+                f.seek(pos)
+            tags[tag] = list(struct.unpack(bo + code * n, data))
+
+    if _TAG_TILE_WIDTH in tags or _TAG_STRIP_OFFSETS not in tags or _TAG_STRIP_BYTES not in tags:
+        return None
+    if tags.get(_TAG_COMPRESSION, [1])[0] != 1:
+        return None
+
+    width = tags[_TAG_WIDTH][0]
+    height = tags[_TAG_LENGTH][0]
+    samples = tags.get(_TAG_SAMPLES, [1])[0]
+    bits = tags.get(_TAG_BITS, [1])
+    if len(set(bits)) != 1 or bits[0] not in (8, 16, 32, 64):
+        return None
+    kind = {1: "u", 2: "i", 3: "f"}.get(tags.get(_TAG_SAMPLE_FORMAT, [1])[0])
+    if kind is None or (kind == "f" and bits[0] == 8):
+        return None
+    dtype = np.dtype(f"{bo}{kind}{bits[0] // 8}")
+    planar = tags.get(_TAG_PLANAR, [1])[0]
+
+    offsets = tags[_TAG_STRIP_OFFSETS]
+    byte_counts = tags[_TAG_STRIP_BYTES]
+    planes = samples if planar == 2 else 1
+    if len(offsets) != len(byte_counts) or len(offsets) % planes:
+        return None
+    strips_per_plane = len(offsets) // planes
+    plane_bytes = width * height * (1 if planar == 2 else samples) * dtype.itemsize
+
+    # every plane must be one contiguous run of strips so it can be mapped as a single array
+    plane_offsets = []
+    for p in range(planes):
+        start = p * strips_per_plane
+        pos = offsets[start]
+        for s in range(start, start + strips_per_plane):
+            if offsets[s] != pos:
+                return None
+            pos += byte_counts[s]
+        if pos - offsets[start] < plane_bytes:
+            return None
+        plane_offsets.append(offsets[start])
+
+    return {
+        "dtype": dtype,
+        "height": height,
+        "width": width,
+        "samples": samples,
+        "planar": planar,
+        "offsets": plane_offsets,
+    }
+
+
+def _open_file(path: str, raw_shape: tuple[int, ...] | None, raw_dtype: str | None):
+    """Return (band_count, getter) for a single band file; getter(i) yields a 2D band array."""
+    if os.path.splitext(path)[1].lower() in RAW_EXTENSIONS:
+        if raw_shape is None or raw_dtype is None:
+            raise ValueError(f"raw band file needs raw_shape and raw_dtype: {path}")
+        shape = tuple(raw_shape)
+        if len(shape) == 2:
+            shape = (1,) + shape
+        # band-sequential layout: (bands, height, width)
+        mm = np.memmap(path, dtype=np.dtype(raw_dtype), mode="r", shape=shape)
+        return shape[0], lambda i: mm[i]
+
+    layout = _read_tiff_layout(path)
+    if layout is not None:
+        h, w, c = layout["height"], layout["width"], layout["samples"]
+        if layout["planar"] == 2:
+            # one plane per band: map only the planes that are requested
+            def get_plane(i):
+                return np.memmap(path, dtype=layout["dtype"], mode="r", offset=layout["offsets"][i], shape=(h, w))
+            return c, get_plane
+        mm = np.memmap(path, dtype=layout["dtype"], mode="r", offset=layout["offsets"][0], shape=(h, w, c))
+        # strided views into the interleaved buffer, nothing is copied
+        return c, lambda i: mm[..., i]
+
+    # PIL only reads the header here; pixels are decoded once, on first band access
+    img = Image.open(path)
+    decoded = []
+
+    def get_band(i):
+        if not decoded:
+            decoded.append(np.asarray(img))
+        arr = decoded[0]
+        return arr if arr.ndim == 2 else arr[..., i]
+    return len(img.getbands()), get_band
+
+
+def read_bands(paths: Sequence[str], indices: Sequence[int], raw_shape: tuple[int, ...] | None = None,
+               raw_dtype: str | None = None) -> list[np.ndarray]:
+    """Read selected bands from one or more band files without loading the others.
+
+    - paths: band files of one photo; bands are numbered across files in the given order
+    - indices: 0-based band numbers to return
+    - raw_shape, raw_dtype: (height, width) or (bands, height, width) and numpy dtype for .raw/.bin files
+
+    Uncompressed TIFF strips and raw files are memory-mapped, other formats are decoded by PIL.
+    Arrays keep the native dtype of the file. Raises ValueError for out-of-range indices.
+    """
+    files = []
+    total = 0
+    for p in paths:
+        n, getter = _open_file(p, raw_shape, raw_dtype)
+        files.append((total, n, getter))
+        total += n
+
+    bands = []
+    for index in indices:
+        if index < 0 or index >= total:
+            raise ValueError(f"band index {index} out of range (0..{total - 1})")
+        for first, n, getter in files:
+            if first <= index < first + n:
+                bands.append(getter(index - first))
+                break
+    return bands
+
+
+def reflectance_scale(band: np.ndarray) -> float:
+    """Return the factor that maps stored values of `band` to 0..1 reflectance.
+
+    Integer bands are scaled by the maximum of their native bit depth; float bands
+    are assumed to hold reflectance already.
+    """
+    if np.issubdtype(band.dtype, np.integer):
+        return 1.0 / float(np.iinfo(band.dtype).max)
+    return 1.0
@@ -1,49 +1,58 @@
 from PIL import Image
 import numpy as np
 import os
+from typing import Sequence
 
-def compute_ndvi(input_path: str, output_path: str, red_index: int = 0, nir_index: int = 3) -> bool:
+from app.image.bands import read_bands, reflectance_scale
+
+# rows processed per step, so float buffers stay small even for large mapped rasters
+NDVI_BLOCK_ROWS = 512
+
+
+def compute_ndvi(input_path: str | Sequence[str], output_path: str, red_index: int = 0, nir_index: int = 3,
+                 raw_shape: tuple[int, ...] | None = None, raw_dtype: str | None = None) -> bool:
     """Compute a simple NDVI image from input image and save visualization to output_path.
 
-    - input_path: filesystem path to image
+    - input_path: filesystem path to image, or a list of band files making up one photo
     - output_path: filesystem path where visualization PNG will be saved
-    - red_index, nir_index: integer channel indices (0-based) to use for Red and NIR bands
+    - red_index, nir_index: integer band indices (0-based) to use for Red and NIR bands;
+      for several files bands are numbered across the files in the given order
+    - raw_shape, raw_dtype: (height, width) or (bands, height, width) and numpy dtype for .raw/.bin files
+
+    Only the two requested bands are read. Uncompressed TIFF/raw bands are memory-mapped
+    and keep their native bit depth; values are scaled to reflectance before the ratio.
 
     Returns True on success, False on failure.
     """
     try:
-        img = Image.open(input_path)
-        arr = np.array(img)
-        if arr.ndim == 2:
-            # single band
-            return False
-        if arr.ndim == 3:
-            h, w, c = arr.shape
-        else:
+        paths = [input_path] if isinstance(input_path, str) else list(input_path)
+        red, nir = read_bands(paths, [red_index, nir_index], raw_shape=raw_shape, raw_dtype=raw_dtype)
+        if red.ndim != 2 or red.shape != nir.shape:
             return False
+        red_scale = reflectance_scale(red)
+        nir_scale = reflectance_scale(nir)
+
+        h, w = red.shape
+        rgb = np.zeros((h, w, 3), dtype=np.uint8)
+        for y in range(0, h, NDVI_BLOCK_ROWS):
+            rows = slice(y, y + NDVI_BLOCK_ROWS)
+            r = red[rows].astype(np.float32) * red_scale
+            n = nir[rows].astype(np.float32) * nir_scale
+
+            denom = (n + r)
+            # avoid division by zero
+            denom[denom == 0] = 1e-6
+            ndvi = (n - r) / denom
+
+            # clip to [-1,1]
+            ndvi = np.clip(ndvi, -1.0, 1.0)
+            # normalize to 0..1
+            ndvi_norm = (ndvi + 1.0) / 2.0
+
+            # simple color mapping: R = (1-ndvi)*255, G = ndvi*255, B = 0
+            rgb[rows, :, 0] = ((1.0 - ndvi_norm) * 255.0).astype(np.uint8)
+            rgb[rows, :, 1] = (ndvi_norm * 255.0).astype(np.uint8)
 
-        if red_index < 0 or red_index >= c or nir_index < 0 or nir_index >= c:
-            return False
-
-        red = arr[..., red_index].astype(float)
-        nir = arr[..., nir_index].astype(float)
-
-        denom = (nir + red)
-        # avoid division by zero
-        denom[denom == 0] = 1e-6
-        ndvi = (nir - red) / denom
-
-        # clip to [-1,1]
-        ndvi = np.clip(ndvi, -1.0, 1.0)
-        # normalize to 0..1
-        ndvi_norm = (ndvi + 1.0) / 2.0
-
-        # simple color mapping: R = (1-ndvi)*255, G = ndvi*255, B = 0
-        r = ((1.0 - ndvi_norm) * 255.0).astype(np.uint8)
-        g = (ndvi_norm * 255.0).astype(np.uint8)
-        b = np.zeros_like(r, dtype=np.uint8)
-
-        rgb = np.stack([r, g, b], axis=-1)
         out_img = Image.fromarray(rgb)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         out_img.save(output_path, format="PNG")
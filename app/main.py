@@ -3,6 +3,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from jose import jwt, JWTError
+from sqlalchemy.orm import load_only
 
 from .database import Base, engine, SessionLocal
 from . import models
@@ -11,8 +12,10 @@ from app.features.auth.utils import SECRET_KEY, ALGORITHM
 from .models import User
 from .models import Task
 from app.features.tasks.routes import router as tasks_router
+from .migrations import run_migrations
 
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
 
 app = FastAPI(title="EcoRegen")
 
@@ -65,7 +68,13 @@ def home(request: Request):
     # Показываем последние задачи на главной странице
     db = SessionLocal()
     try:
-        tasks = db.query(Task).order_by(Task.created_at.desc()).limit(5).all()
+        tasks = (
+            db.query(Task)
+            .options(load_only(Task.id, Task.title, Task.description, Task.created_at))
+            .order_by(Task.created_at.desc())
+            .limit(5)
+            .all()
+        )
     finally:
         db.close()
     return templates.TemplateResponse("home.html", {"request": request, "user": request.state.user, "tasks": tasks})
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""In-place upgrades for existing app.db files (create_all only creates missing tables)."""
+import json
+import sqlite3
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .models import Task
+
+# (kind, path column, params column, error column) of the old inline result columns on tasks
+_LEGACY_RESULT_COLUMNS = [
+    ("ndvi", "ndvi_path", "ndvi_params", "ndvi_error"),
+    ("segmentation", "segmentation_path", "segmentation_params", "segmentation_error"),
+]
+_LEGACY_TASK_COLUMNS = [
+    "ndvi_path", "ndvi_params", "ndvi_error",
+    "segmentation_path", "segmentation_params", "segmentation_error",
+    "ndvi_settings",
+]
+
+
+def _move_task_results(engine: Engine) -> None:
+    """Copy inline NDVI/segmentation results from tasks into task_results, then drop the old columns."""
+    from app.features.tasks.results import params_hash
+
+    columns = {c["name"] for c in inspect(engine).get_columns("tasks")}
+    legacy = [c for c in _LEGACY_TASK_COLUMNS if c in columns]
+    if not legacy:
+        return
+
+    with engine.begin() as conn:
+        for kind, path_col, params_col, error_col in _LEGACY_RESULT_COLUMNS:
+            if not {path_col, params_col, error_col} <= columns:
+                continue
+            rows = conn.execute(text(
+                f"SELECT id, {path_col}, {params_col}, {error_col} FROM tasks "
+                f"WHERE {path_col} IS NOT NULL OR {error_col} IS NOT NULL"
+            )).all()
+            for task_id, path, params, error in rows:
+                try:
+                    parsed = json.loads(params) if params else {}
+                except ValueError:
+                    parsed = {"raw": params}
+                conn.execute(text(
+                    "INSERT OR IGNORE INTO task_results (task_id, kind, params_hash, params, path, error) "
+                    "VALUES (:task_id, :kind, :params_hash, :params, :path, :error)"
+                ), {
+                    "task_id": task_id,
+                    "kind": kind,
+                    "params_hash": params_hash(parsed),
+                    "params": params,
+                    "path": path,
+                    "error": error,
+                })
+
+        # DROP COLUMN needs SQLite 3.35+; older versions keep the unused columns, the ORM ignores them
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            for name in legacy:
+                conn.execute(text(f"ALTER TABLE tasks DROP COLUMN {name}"))
+
+
+def run_migrations(engine: Engine) -> None:
+    """Bring an existing database up to the current models. Safe to run on every start."""
+    _move_task_results(engine)
+    # indexes added to existing tables are not created by create_all
+    for index in Task.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, Boolean, DateTime, func, UniqueConstraint
+from sqlalchemy import String, Integer, Boolean, DateTime, func, UniqueConstraint, Index
 from .database import Base
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import relationship
@@ -28,22 +28,35 @@ class Task(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # path to original uploaded photo (relative URL like /static/uploads/..)
     photo_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
     owner_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     owner = relationship("User", backref="tasks")
-    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    # path to original uploaded photo (relative URL like /static/uploads/..)
-    photo_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    # path to last generated NDVI image (relative URL)
-    ndvi_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    # JSON string with last NDVI params (e.g. {"red":0,"nir":2})
-    ndvi_params: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    # last NDVI processing error message (if any)
-    ndvi_error: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    # segmentation fields
-    segmentation_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    segmentation_params: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    segmentation_error: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    ndvi_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
-    ndvi_settings: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    # processing outputs live in task_results; loaded only when explicitly queried
+    results = relationship("TaskResult", back_populates="task", cascade="all, delete-orphan", lazy="select")
+
+
+class TaskResult(Base):
+    """One processing output (NDVI, segmentation, ...) of a task for a given set of params."""
+    __tablename__ = "task_results"
+    __table_args__ = (
+        UniqueConstraint("task_id", "kind", "params_hash", name="uq_task_results_task_kind_params"),
+        # "latest result per kind" lookups for a task
+        Index("ix_task_results_task_kind_updated", "task_id", "kind", "updated_at"),
+    )
 
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    task = relationship("Task", back_populates="results")
+    # analysis type, e.g. "ndvi" or "segmentation"
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    # sha256 of the canonical JSON params, so equal params map to the same row
+    params_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    # JSON string with params (e.g. {"red_index":0,"nir_index":3})
+    params: Mapped[str | None] = mapped_column(String(1024), nullable=True)
+    # path to generated image (relative URL), None if processing failed
+    path: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    # processing error message (if any)
+    error: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)